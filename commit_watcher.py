@@ -1,6 +1,9 @@
 """Monitors GitHub repositories for new commits, sends Discord webhooks.
 
 Periodically checks specified GitHub repositories and their branches for new commits.
+If a webhook secret is configured, GitHub `push` webhooks are also received, so
+commits are announced as soon as they are pushed and polling only catches up on
+missed deliveries.
 
 When new commits are detected, it formats them into a message that mimics Discord's
 native embed style for commits and sends it to a configured Discord webhook. Tracks the
@@ -11,34 +14,50 @@ from __future__ import annotations
 
 import fnmatch
 import hashlib
+import hmac
 import json
 import logging
 import os
+import queue
+import re
 import signal
+import sqlite3
 import sys
 import threading
 import time
-from dataclasses import dataclass
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from functools import cache, lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Literal, Optional, cast
+from urllib.parse import urlencode
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from utils.logging import configure_logging
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
     from types import FrameType
 
-    from utils.types import Branch, Commit
+    from utils.types import Branch, BranchState, Commit, Event, GitHubCommit
 
 shutdown_event = threading.Event()
 
 STATUS_OK = 200
 STATUS_NO_CONTENT = 204
+STATUS_NOT_MODIFIED = 304
+STATUS_FORBIDDEN = 403
+STATUS_TOO_MANY_REQUESTS = 429
 MAX_MESSAGE_LENGTH = 55
 TRUNCATE_LENGTH = 52
+# Discord rejects embeds with longer descriptions
+MAX_DESCRIPTION_LENGTH = 4096
 
 
 def handle_shutdown(_signum: int, _frame: Optional[FrameType]) -> None:
@@ -71,21 +90,52 @@ if not GITHUB_REPOS or not DISCORD_WEBHOOK_URL:
 
 BRANCH_BLACKLIST = os.getenv("BRANCH_BLACKLIST", "").strip()
 
-
-@dataclass
+# Detect pushed branches from the repository events feed instead of listing
+# branches. The feed can lag behind pushes, so this is opt-in.
+USE_EVENTS_FEED = os.getenv("USE_EVENTS_FEED", "").strip().lower() in {
+    "1",
+    "true",
+    "yes",
+}
+
+# Look up Gravatars (by email hash) for authors without a GitHub avatar. When
+# disabled, they all get the same default avatar.
+ENABLE_GRAVATAR = os.getenv("ENABLE_GRAVATAR", "true").strip().lower() in {
+    "1",
+    "true",
+    "yes",
+}
+DEFAULT_AVATAR_URL = "https://www.gravatar.com/avatar/?d=identicon&f=y"
+
+# Receive GitHub `push` webhooks when a secret to verify them with is set
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080") or "8080")
+# GitHub caps webhook payloads at 25 MB
+MAX_WEBHOOK_PAYLOAD_BYTES = 25 * 1024 * 1024
+
+
+@dataclass(frozen=True)
 class Repository:
     """Represents a GitHub repository.
 
+    The API URLs are built once here rather than on every poll.
+
     Attributes:
         owner: The owner of the repository.
         name: The name of the repository.
+        key: The repository key, in the format `'owner/repo'`.
         api_url: The API URL for fetching commits.
+        branches_url: The API URL for listing branches.
+        events_url: The API URL for the repository events feed.
 
     """
 
     owner: str
     name: str
+    key: str
     api_url: str
+    branches_url: str
+    events_url: str
 
     @classmethod
     def from_repo_string(cls, repo_string: str) -> Repository:
@@ -94,46 +144,85 @@ class Repository:
         Args:
             repo_string: The repository string in the format `'owner/repo'`.
 
+        Raises:
+            ValueError: If the string is not in the format `'owner/repo'`.
+
+        """
+        owner, _, name = repo_string.partition("/")
+        if not owner or not name or "/" in name:
+            msg = "expected `owner/repo`"
+            raise ValueError(msg)
+        base_url = f"https://api.github.com/repos/{owner}/{name}"
+        return cls(
+            owner=owner,
+            name=name,
+            key=f"{owner}/{name}",
+            api_url=f"{base_url}/commits",
+            branches_url=f"{base_url}/branches?per_page=100",
+            events_url=f"{base_url}/events?per_page=100",
+        )
+
+    def commits_url_for(self, branch_name: str, since: Optional[str] = None) -> str:
+        """Build the API URL listing a branch's commits.
+
+        Branch names may contain characters like `#`, `&` or `+`, so the query is
+        encoded rather than interpolated.
+
+        Args:
+            branch_name: The name of the branch.
+            since: Only list commits made at or after this ISO 8601 timestamp.
+
+        Returns:
+            The API URL.
+
         """
-        owner, name = repo_string.split("/")
-        api_url = f"https://api.github.com/repos/{owner}/{name}/commits"
-        return cls(owner=owner, name=name, api_url=api_url)
+        params = {"sha": branch_name}
+        if since:
+            params["since"] = since
+        # Keep `/` and `:` readable; they are common in branch names and timestamps
+        return f"{self.api_url}?{urlencode(params, safe='/:')}"
 
 
-def parse_blacklist_patterns(blacklist_string: str) -> dict[str, list[str]]:
+def parse_blacklist_patterns(blacklist_string: str) -> dict[str, re.Pattern[str]]:
     """Parse the branch blacklist string into a dictionary.
 
     The blacklist string can contain global patterns or patterns specific
-    to a repository, in the format `'owner/repo:pattern'`.
+    to a repository, in the format `'owner/repo:pattern'`. The wildcard patterns of
+    each repository (and the global ones) are combined into a single regular
+    expression, so checking a branch takes one match.
 
     Args:
         blacklist_string: The comma-separated blacklist string.
 
     Returns:
-        A dictionary mapping repositories to their blacklist patterns.
+        A dictionary mapping repositories (or `'global'`) to their compiled
+        blacklist pattern.
 
     """
-    blacklist_patterns: dict[str, list[str]] = {"global": []}
     if not blacklist_string:
-        return blacklist_patterns
+        return {}
 
+    grouped_patterns: dict[str, list[str]] = {}
     patterns = [p.strip() for p in blacklist_string.split(",")]
     for pattern in patterns:
         if ":" in pattern:
             repo_key, branch_pattern = pattern.split(":", 1)
-            if repo_key not in blacklist_patterns:
-                blacklist_patterns[repo_key] = []
-            blacklist_patterns[repo_key].append(branch_pattern)
         else:
-            blacklist_patterns["global"].append(pattern)
+            repo_key, branch_pattern = "global", pattern
+        grouped_patterns.setdefault(repo_key, []).append(
+            fnmatch.translate(branch_pattern),
+        )
 
-    return blacklist_patterns
+    return {
+        repo_key: re.compile("|".join(f"(?:{regex})" for regex in regexes))
+        for repo_key, regexes in grouped_patterns.items()
+    }
 
 
 def is_branch_blacklisted(
     repo_key: str,
     branch_name: str,
-    blacklist_patterns: dict[str, list[str]],
+    blacklist_patterns: dict[str, re.Pattern[str]],
 ) -> bool:
     """Check if a branch is blacklisted.
 
@@ -146,40 +235,221 @@ def is_branch_blacklisted(
         `True` if the branch is blacklisted, `False` otherwise.
 
     """
-    # Check for global blacklists
-    for pattern in blacklist_patterns.get("global", []):
-        if fnmatch.fnmatch(branch_name, pattern):
-            return True
-
-    # Check for repo-specific blacklists
-    for pattern in blacklist_patterns.get(repo_key, []):
-        if fnmatch.fnmatch(branch_name, pattern):
+    # Check the global blacklist, then the repo-specific one
+    for key in ("global", repo_key):
+        pattern = blacklist_patterns.get(key)
+        if pattern and pattern.match(branch_name):
             return True
 
     return False
 
 
-# Parse repository configurations
-REPOSITORIES = [
-    Repository.from_repo_string(repo.strip()) for repo in GITHUB_REPOS.split(",")
-]
+@cache
+def get_repositories() -> tuple[Repository, ...]:
+    """Parse the repositories to monitor from `GITHUB_REPOS`.
+
+    Parsed on first use, and again after the configuration is reloaded. Malformed
+    entries are logged and skipped.
+
+    Returns:
+        The repositories to monitor. A tuple, as the result is shared between
+        callers until the next reload.
+
+    """
+    repositories = []
+    for repo_string in os.getenv("GITHUB_REPOS", "").split(","):
+        if not repo_string.strip():
+            continue
+        try:
+            repositories.append(Repository.from_repo_string(repo_string.strip()))
+        except ValueError as e:
+            # A configuration typo, so no traceback
+            logger.error(  # noqa: TRY400
+                "Ignoring malformed repository `%s` in GITHUB_REPOS: %s",
+                repo_string.strip(),
+                e,
+            )
+    return tuple(repositories)
+
 
-POLL_INTERVAL_SECONDS = float(os.getenv("POLL_INTERVAL_SECONDS", "120") or "120")
-# Defaults to 2 minutes
+def reload_config(_signum: int, _frame: Optional[FrameType]) -> None:
+    """Reload the repositories to monitor on `SIGHUP`.
+
+    `.env` is read again, so repositories can be added or removed without a restart.
+
+    Args:
+        _signum: The signal number.
+        _frame: The current stack frame.
+
+    """
+    load_dotenv(override=True)
+    get_repositories.cache_clear()
+    logger.info("Reloading the repositories to monitor...")
+
+
+if hasattr(signal, "SIGHUP"):
+    signal.signal(signal.SIGHUP, reload_config)
+
+POLL_INTERVAL_SECONDS = float(
+    os.getenv("POLL_INTERVAL_SECONDS") or ("1800" if WEBHOOK_SECRET else "120"),
+)
+# Defaults to 2 minutes, or 30 minutes when webhooks deliver new commits
 # Note the API's rate limit is 60 requests per hour for unauthenticated
 # requests
 
-HEADERS = {"Accept": "application/vnd.github.v3+json"}
+# Responses are gzip-compressed, as `requests` asks for that by default
+HEADERS = {
+    "Accept": "application/vnd.github+json",
+    "X-GitHub-Api-Version": "2022-11-28",
+}
 if GITHUB_TOKEN:
     HEADERS["Authorization"] = f"token {GITHUB_TOKEN}"
 
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+# The head commit of every branch of a repository. GraphQL requires
+# authentication, so this is only used when `GITHUB_TOKEN` is set.
+GRAPHQL_BRANCH_HEADS_FRAGMENT = """
+fragment BranchHeads on Repository {
+  refs(refPrefix: "refs/heads/", first: 100, after: $after) {
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+    nodes {
+      name
+      target {
+        oid
+        ... on Commit {
+          committedDate
+        }
+      }
+    }
+  }
+}
+"""
+
+LAST_COMMITS_DB = Path("last_commits.db")
+# Where older versions kept the last processed commits; imported once
 LAST_COMMITS_FILE = Path("last_commits.json")
 
+# Guards `last_commits`, and writes to `LAST_COMMITS_DB`, while repositories are
+# checked concurrently and webhooks are received
+LAST_COMMITS_LOCK = threading.Lock()
+
+# Conditional request cache: URL -> (ETag, response body as last returned).
+# GitHub answers a matching `If-None-Match` with a `304 Not Modified`, which has an
+# empty body and, for authenticated requests, does not count against the primary
+# rate limit.
+ETAG_CACHE: dict[str, tuple[str, list[Any]]] = {}
+# Saved across restarts so polling resumes with conditional requests
+ETAG_CACHE_FILE = Path("etag_cache.json")
+# Bump whenever the shape of cached bodies (e.g., `Commit`) changes
+ETAG_CACHE_VERSION = 3
+ETAG_CACHE_CHANGED = threading.Event()
+
+
+# GitHub's separately budgeted rate limits, as named by `X-RateLimit-Resource`
+RATE_LIMIT_CORE = "core"
+RATE_LIMIT_GRAPHQL = "graphql"
+
+
+@dataclass
+class RateLimit:
+    """The state of one of GitHub's rate limits.
+
+    Attributes:
+        remaining: Requests left in the current window, per `X-RateLimit-Remaining`.
+        reset: When the current window resets, in seconds since the epoch, per
+            `X-RateLimit-Reset`.
+        requests_made: Requests made so far that counted against the limit
+            (everything but `304 Not Modified` responses to authenticated requests).
+
+    """
+
+    remaining: Optional[int] = None
+    reset: float = 0.0
+    requests_made: int = 0
+
+
+@dataclass
+class ApiState:
+    """Hints taken from GitHub API response headers.
+
+    Attributes:
+        poll_interval: The minimum polling interval requested via `X-Poll-Interval`.
+        retry_after: When requests may resume after a secondary rate limit, in
+            seconds since the epoch, per `Retry-After`.
+        rate_limits: The REST (`RATE_LIMIT_CORE`) and GraphQL (`RATE_LIMIT_GRAPHQL`)
+            rate limits, which GitHub budgets separately.
+
+    """
+
+    poll_interval: float = 0.0
+    retry_after: float = 0.0
+    rate_limits: dict[str, RateLimit] = field(
+        default_factory=lambda: {
+            RATE_LIMIT_CORE: RateLimit(),
+            RATE_LIMIT_GRAPHQL: RateLimit(),
+        },
+    )
+
+
+API_STATE = ApiState()
+# Guards the `requests_made` counts, which repository workers update concurrently
+API_STATE_LOCK = threading.Lock()
+
 # Retry configuration
 MAX_RETRIES = 3
 INITIAL_BACKOFF_SECONDS = 1.0
 BACKOFF_MULTIPLIER = 2.0
 
+# Discord embeds waiting to be posted: (embed, repository, branch name). A `None`
+# entry tells the worker to stop. Bounded so an extended Discord outage can't grow
+# memory without limit; embeds beyond it are dropped (and logged) rather than
+# blocking the pollers and webhook handlers that queue them.
+MAX_QUEUED_EMBEDS = 1000
+DISCORD_QUEUE: queue.Queue[Optional[tuple[dict[str, Any], str, str]]] = queue.Queue(
+    maxsize=MAX_QUEUED_EMBEDS,
+)
+
+# Discord accepts up to 10 embeds per webhook message, with at most 6000 characters
+# of text across all of them
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARACTERS_PER_MESSAGE = 6000
+
+# Pause GitHub requests until the rate limit resets once this few remain, leaving the
+# rest of the budget to other tools sharing the token
+RATE_LIMIT_MIN_REMAINING = int(os.getenv("RATE_LIMIT_MIN_REMAINING", "10") or "10")
+
+# Fetches the commits of a repository's updated branches concurrently
+BRANCH_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="branches")
+
+# One session for all requests so connections (and their TLS handshakes) to GitHub
+# and Discord are reused across polls. Rate limiting and transient server errors of
+# `GET`s are retried by urllib3, honoring `Retry-After`; connection errors and
+# timeouts are retried by `request_with_retry`. `POST`s are left alone: a 5xx from
+# Discord may come after the message was already delivered, and Discord's 429s are
+# retried by `post_to_discord`.
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=MAX_RETRIES,
+            connect=0,
+            read=0,
+            backoff_factor=0.5,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=("GET",),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        ),
+    ),
+)
+
 
 def request_with_retry(
     method: Literal["get", "post", "put", "patch", "delete", "head", "options"],
@@ -202,11 +472,16 @@ def request_with_retry(
 
     for attempt in range(MAX_RETRIES):
         try:
-            return requests.request(method, url, timeout=10, **kwargs)
+            return SESSION.request(method, url, timeout=10, **kwargs)
         except (  # noqa: PERF203
             requests.exceptions.ConnectionError,
             requests.exceptions.Timeout,
         ) as e:
+            if method == "post" and isinstance(e, requests.exceptions.ReadTimeout):
+                # The request was sent and may have been processed; resending it
+                # could post the same message twice
+                logger.exception("Request to %s timed out awaiting a response", url)
+                return None
             if attempt < MAX_RETRIES - 1:
                 logger.warning(
                     "Request to %s failed (attempt %d/%d): %s. Retrying in %.1fs...",
@@ -231,6 +506,161 @@ def request_with_retry(
     return None
 
 
+def conditional_get(url: str) -> Optional[requests.Response]:
+    """Make a GitHub API `GET`, revalidating any cached ETag for the URL.
+
+    A `304 Not Modified` response means the body cached for `url` in `ETAG_CACHE` is
+    still current.
+
+    Args:
+        url: The GitHub API URL to request.
+
+    Returns:
+        The response object, or `None` if all retries failed.
+
+    """
+    wait_for_rate_limit()
+    headers = HEADERS
+    cached = ETAG_CACHE.get(url)
+    if cached:
+        headers = {**HEADERS, "If-None-Match": cached[0]}
+    response = request_with_retry("get", url, headers=headers)
+    if response is not None:
+        record_api_state(response)
+    return response
+
+
+def record_api_state(
+    response: requests.Response,
+    resource: str = RATE_LIMIT_CORE,
+) -> None:
+    """Update `API_STATE` from the headers of a GitHub API response.
+
+    Args:
+        response: The GitHub API response.
+        resource: The rate limit the request counted against.
+
+    """
+    rate_limit = API_STATE.rate_limits[resource]
+    # Only authenticated requests get `304 Not Modified` responses for free
+    if response.status_code != STATUS_NOT_MODIFIED or not GITHUB_TOKEN:
+        with API_STATE_LOCK:
+            rate_limit.requests_made += 1
+    poll_interval = response.headers.get("X-Poll-Interval")
+    if poll_interval and poll_interval.isdigit():
+        API_STATE.poll_interval = float(poll_interval)
+    remaining = response.headers.get("X-RateLimit-Remaining")
+    reset = response.headers.get("X-RateLimit-Reset")
+    if remaining and remaining.isdigit() and reset and reset.isdigit():
+        rate_limit.remaining = int(remaining)
+        rate_limit.reset = float(reset)
+    # Secondary rate limits come with a `Retry-After` instead of an exhausted window
+    retry_after = response.headers.get("Retry-After")
+    if (
+        response.status_code in {STATUS_FORBIDDEN, STATUS_TOO_MANY_REQUESTS}
+        and retry_after
+    ):
+        API_STATE.retry_after = time.time() + parse_seconds(retry_after, 60.0)
+
+
+def wait_for_rate_limit(resource: str = RATE_LIMIT_CORE) -> None:
+    """Block until a rate limit resets if too few GitHub requests remain in it.
+
+    Also waits out any `Retry-After` from a secondary rate limit. Returns early if a
+    shutdown is requested while waiting.
+
+    Args:
+        resource: The rate limit the next request counts against.
+
+    """
+    retry_after_seconds = API_STATE.retry_after - time.time()
+    if retry_after_seconds > 0:
+        logger.warning(
+            "Secondary rate limit hit, waiting %.0fs before the next GitHub request...",
+            retry_after_seconds,
+        )
+        shutdown_event.wait(retry_after_seconds)
+    rate_limit = API_STATE.rate_limits[resource]
+    remaining = rate_limit.remaining
+    if remaining is None or remaining >= RATE_LIMIT_MIN_REMAINING:
+        return
+    wait_seconds = rate_limit.reset - time.time()
+    if wait_seconds <= 0:
+        return
+    logger.warning(
+        "Only %d GitHub API requests remaining (%s), waiting %.0fs for the rate "
+        "limit to reset...",
+        remaining,
+        resource,
+        wait_seconds,
+    )
+    shutdown_event.wait(wait_seconds)
+
+
+def requests_made() -> dict[str, int]:
+    """Snapshot how many requests have counted against each rate limit so far.
+
+    Returns:
+        A dictionary mapping rate limits to their `requests_made` counts.
+
+    """
+    with API_STATE_LOCK:
+        return {
+            resource: rate_limit.requests_made
+            for resource, rate_limit in API_STATE.rate_limits.items()
+        }
+
+
+def rate_limited_interval(requests_before: dict[str, int]) -> float:
+    """Compute the shortest poll interval the remaining rate limits can sustain.
+
+    For each rate limit, the requests left in the current window, less the
+    `RATE_LIMIT_MIN_REMAINING` reserve, are spread evenly over the time until it
+    resets, assuming every cycle costs as many requests as the last one. The most
+    constrained rate limit decides.
+
+    Args:
+        requests_before: The `requests_made()` snapshot from the start of the last
+            poll cycle.
+
+    Returns:
+        The interval in seconds, or `0.0` if the rate limits are not a constraint.
+
+    """
+    interval = 0.0
+    for resource, requests_after in requests_made().items():
+        requests_per_cycle = requests_after - requests_before.get(resource, 0)
+        rate_limit = API_STATE.rate_limits[resource]
+        seconds_to_reset = rate_limit.reset - time.time()
+        if (
+            rate_limit.remaining is None
+            or not requests_per_cycle
+            or seconds_to_reset <= 0
+        ):
+            continue
+        cycles_left = (
+            max(rate_limit.remaining - RATE_LIMIT_MIN_REMAINING, 0) / requests_per_cycle
+        )
+        # Never wait past the reset, when a full window becomes available again
+        interval = max(interval, seconds_to_reset / max(cycles_left, 1.0))
+    return interval
+
+
+def cache_response(url: str, response: requests.Response, body: list[Any]) -> None:
+    """Remember a response body under its ETag for later conditional requests.
+
+    Args:
+        url: The GitHub API URL that was requested.
+        response: The successful response.
+        body: The body to return when GitHub answers `304 Not Modified`.
+
+    """
+    etag = response.headers.get("ETag")
+    if etag:
+        ETAG_CACHE[url] = (etag, body)
+        ETAG_CACHE_CHANGED.set()
+
+
 def get_avatar_url(commit: Commit) -> Optional[str]:
     """Fetch avatar URL.
 
@@ -243,20 +673,37 @@ def get_avatar_url(commit: Commit) -> Optional[str]:
         The avatar URL or Gravatar URL.
 
     """
-    if commit.get("author") and commit["author"].get("avatar_url"):
-        return str(commit["author"]["avatar_url"])
-    email = commit["commit"]["author"].get("email")
+    if commit["avatar_url"]:
+        return commit["avatar_url"]
+    if not ENABLE_GRAVATAR:
+        return DEFAULT_AVATAR_URL
+    email = commit["author_email"]
     if email:
-        email = email.strip().lower()
-        email_hash = hashlib.md5(
-            email.encode("utf-8"),
-            usedforsecurity=False,
-        ).hexdigest()
-        logger.debug("Using Gravatar for email `%s`: hash=`%s`", email, email_hash)
-        return f"https://www.gravatar.com/avatar/{email_hash}?d=identicon"
+        return get_gravatar_url(email.strip().lower())
     return None
 
 
+@lru_cache(maxsize=4096)
+def get_gravatar_url(email: str) -> str:
+    """Build the Gravatar URL for a normalized email address.
+
+    Cached, as the same authors show up across many commits.
+
+    Args:
+        email: The stripped, lowercased email address.
+
+    Returns:
+        The Gravatar URL, falling back to an identicon.
+
+    """
+    email_hash = hashlib.md5(
+        email.encode("utf-8"),
+        usedforsecurity=False,
+    ).hexdigest()
+    logger.debug("Using Gravatar for email `%s`: hash=`%s`", email, email_hash)
+    return f"https://www.gravatar.com/avatar/{email_hash}?d=identicon"
+
+
 def get_branches(repo: Repository) -> list[Branch]:
     """Fetch list of branches for a repository.
 
@@ -264,137 +711,548 @@ def get_branches(repo: Repository) -> list[Branch]:
         repo: The repository object.
 
     Returns:
-        A list of branches in the repository.
+        A list of branches in the repository, with their head commits.
 
     """
-    branches_url = f"https://api.github.com/repos/{repo.owner}/{repo.name}/branches"
-    response = request_with_retry("get", branches_url, headers=HEADERS)
+    response = conditional_get(repo.branches_url)
     if response is None:
         logger.error(
-            "Failed to fetch branches for %s/%s after retries",
-            repo.owner,
-            repo.name,
+            "Failed to fetch branches for %s after retries",
+            repo.key,
         )
         return []
-    if response.status_code != STATUS_OK:
+    if response.status_code == STATUS_NOT_MODIFIED:
+        branches = cast("list[Branch]", ETAG_CACHE[repo.branches_url][1])
+    elif response.status_code == STATUS_OK:
+        branches = response.json()
+        cache_response(repo.branches_url, response, branches)
+    else:
         logger.error(
-            "Error fetching branches for %s/%s: `%s`",
-            repo.owner,
-            repo.name,
+            "Error fetching branches for %s: `%s`",
+            repo.key,
             response.text,
         )
         return []
-    branches: list[Branch] = response.json()
     return branches
 
 
+def get_push_events(repo: Repository) -> Optional[dict[str, str]]:
+    """Fetch the most recently pushed head commit per branch from the events feed.
+
+    One request covers every branch of the repository, so only branches whose head
+    moved need their commits fetched.
+
+    Args:
+        repo: The repository object.
+
+    Returns:
+        A dictionary mapping branch names to their latest pushed commit IDs, or
+        `None` if the events feed could not be fetched.
+
+    """
+    response = conditional_get(repo.events_url)
+    if response is None:
+        logger.error(
+            "Failed to fetch events for %s after retries",
+            repo.key,
+        )
+        return None
+    if response.status_code == STATUS_NOT_MODIFIED:
+        pushes = cast("list[list[str]]", ETAG_CACHE[repo.events_url][1])
+    elif response.status_code == STATUS_OK:
+        events: list[Event] = response.json()
+        # Keep only what is needed of each push, newest first. Branch deletions are
+        # kept with an empty head, so older pushes to deleted branches are ignored
+        pushes = []
+        for event in events:
+            payload = event["payload"]
+            if event["type"] == "PushEvent" and payload.get("ref", "").startswith(
+                "refs/heads/",
+            ):
+                pushes.append(
+                    [payload["ref"].removeprefix("refs/heads/"), payload["head"]],
+                )
+            elif event["type"] == "DeleteEvent" and payload.get("ref_type") == "branch":
+                pushes.append([payload["ref"], ""])
+        cache_response(repo.events_url, response, pushes)
+    else:
+        logger.warning(
+            "Error fetching events for %s, falling back to branch listing: `%s`",
+            repo.key,
+            response.text,
+        )
+        return None
+
+    heads: dict[str, str] = {}
+    for branch_name, head in pushes:
+        heads.setdefault(branch_name, head)
+    # Drop branches whose latest event deleted them
+    return {branch_name: head for branch_name, head in heads.items() if head}
+
+
+def to_commit(
+    github_commit: GitHubCommit,
+    repository: str,
+    branch_name: str,
+) -> Commit:
+    """Reduce a commit returned by the GitHub API to the fields used here.
+
+    Args:
+        github_commit: The commit as returned by the GitHub API.
+        repository: The repository key (e.g., `'owner/repo'`).
+        branch_name: The name of the branch.
+
+    Returns:
+        The commit record.
+
+    """
+    author = github_commit.get("author")
+    message = github_commit["commit"]["message"]
+    return {
+        "id": github_commit["sha"],
+        "short_id": github_commit["sha"][:7],
+        "short_message": truncate_message(message),
+        "author_username": author["login"] if author else "unknown",
+        "author_url": author.get("html_url", "") if author else "",
+        # Resolved (possibly via Gravatar) only for commits shown as embed authors
+        "avatar_url": author.get("avatar_url", "") if author else "",
+        "author_email": github_commit["commit"]["author"].get("email", ""),
+        "url": github_commit["html_url"],
+        "date": github_commit["commit"]["committer"]["date"],
+        "repository": repository,
+        "branch": branch_name,
+    }
+
+
+def get_all_branch_heads(
+    repos: Sequence[Repository],
+) -> dict[str, dict[str, BranchState]]:
+    """Fetch the head commit of every branch of every repository via GraphQL.
+
+    One request covers the first 100 branches of all repositories, replacing a
+    branch listing per repository. Repositories with more branches take one more
+    request per further 100 branches.
+
+    Args:
+        repos: The repositories.
+
+    Returns:
+        A dictionary mapping repository keys to the head commit of each of their
+        branches. Repositories that could not be queried are left out.
+
+    """
+    first_pages = query_branch_heads(repos)
+    all_heads: dict[str, dict[str, BranchState]] = {}
+    for repo in repos:
+        refs = first_pages.get(repo.key)
+        heads: dict[str, BranchState] = {}
+        while refs is not None:
+            heads.update(
+                {
+                    ref["name"]: {
+                        "sha": ref["target"]["oid"],
+                        "date": ref["target"]["committedDate"],
+                    }
+                    for ref in refs["nodes"]
+                    # Skip branches pointing at something other than a commit
+                    if "committedDate" in (ref.get("target") or {})
+                },
+            )
+            if not refs["pageInfo"]["hasNextPage"]:
+                all_heads[repo.key] = heads
+                break
+            refs = query_branch_heads(
+                [repo],
+                after=refs["pageInfo"]["endCursor"],
+            ).get(repo.key)
+    return all_heads
+
+
+def query_branch_heads(
+    repos: Sequence[Repository],
+    after: Optional[str] = None,
+) -> dict[str, dict[str, Any]]:
+    """Query one page of branch heads for several repositories in one request.
+
+    Args:
+        repos: The repositories.
+        after: The cursor to continue from, when querying a single repository.
+
+    Returns:
+        A dictionary mapping repository keys to their GraphQL `refs` connection.
+        Repositories that could not be queried are left out.
+
+    """
+    if not repos:
+        return {}
+    parameters = "".join(
+        f", $owner{index}: String!, $name{index}: String!"
+        for index in range(len(repos))
+    )
+    fields = "".join(
+        f"  r{index}: repository(owner: $owner{index}, name: $name{index}) "
+        "{ ...BranchHeads }\n"
+        for index in range(len(repos))
+    )
+    variables: dict[str, Optional[str]] = {"after": after}
+    for index, repo in enumerate(repos):
+        variables[f"owner{index}"] = repo.owner
+        variables[f"name{index}"] = repo.name
+
+    wait_for_rate_limit(RATE_LIMIT_GRAPHQL)
+    response = request_with_retry(
+        "post",
+        GRAPHQL_URL,
+        json={
+            "query": f"query ($after: String{parameters}) {{\n{fields}}}\n"
+            + GRAPHQL_BRANCH_HEADS_FRAGMENT,
+            "variables": variables,
+        },
+        headers=HEADERS,
+    )
+    if response is None:
+        logger.error("Failed to query branch heads after retries")
+        return {}
+    record_api_state(response, RATE_LIMIT_GRAPHQL)
+    try:
+        body = cast("dict[str, Any]", response.json())
+    except ValueError:
+        body = {}
+    data = body.get("data") or {}
+
+    refs = {}
+    for index, repo in enumerate(repos):
+        repository = (
+            data.get(f"r{index}") if response.status_code == STATUS_OK else None
+        )
+        if not repository:
+            logger.warning(
+                "Error querying branches of %s, falling back to REST: `%s`",
+                repo.key,
+                body.get("errors") or response.text,
+            )
+            continue
+        refs[repo.key] = repository["refs"]
+    return refs
+
+
+def webhook_to_commit(
+    push_commit: dict[str, Any],
+    repository: str,
+    branch_name: str,
+) -> Commit:
+    """Convert a commit from a `push` webhook payload to a commit record.
+
+    Args:
+        push_commit: An entry of the payload's `commits` list.
+        repository: The repository key (e.g., `'owner/repo'`).
+        branch_name: The name of the branch.
+
+    Returns:
+        The commit record, as `to_commit` would build it from the REST API.
+
+    """
+    author = push_commit.get("author") or {}
+    username = author.get("username") or ""
+    return {
+        "id": push_commit["id"],
+        "short_id": push_commit["id"][:7],
+        "short_message": truncate_message(push_commit["message"]),
+        "author_username": username or "unknown",
+        "author_url": f"https://github.com/{username}" if username else "",
+        "avatar_url": (
+            f"https://avatars.githubusercontent.com/{username}" if username else ""
+        ),
+        "author_email": author.get("email") or "",
+        "url": push_commit["url"],
+        "date": push_commit["timestamp"],
+        "repository": repository,
+        "branch": branch_name,
+    }
+
+
 def get_commits_for_branch(
     repo: Repository,
     branch_name: str,
+    since: Optional[str] = None,
 ) -> list[Commit]:
     """Fetch commits for a given branch in a repository.
 
     Args:
         repo: The repository object.
         branch_name: The name of the branch.
+        since: Only fetch commits made at or after this ISO 8601 timestamp.
 
     Returns:
         A list of commits in the branch, or empty list on failure.
 
     """
-    url = f"https://api.github.com/repos/{repo.owner}/{repo.name}/commits?sha={branch_name}"
-    response = request_with_retry("get", url, headers=HEADERS)
+    url = repo.commits_url_for(branch_name, since)
+    response = conditional_get(url)
     if response is None:
         logger.error(
-            "Failed to fetch commits for %s/%s branch %s after retries",
-            repo.owner,
-            repo.name,
+            "Failed to fetch commits for %s branch %s after retries",
+            repo.key,
             branch_name,
         )
         return []
+    if response.status_code == STATUS_NOT_MODIFIED:
+        return cast("list[Commit]", ETAG_CACHE[url][1])
     if response.status_code != STATUS_OK:
         logger.error(
-            "Error fetching commits for %s/%s branch %s: %s",
-            repo.owner,
-            repo.name,
+            "Error fetching commits for %s branch %s: %s",
+            repo.key,
             branch_name,
             response.text,
         )
         return []
-    commits: list[Commit] = response.json()
-    for commit in commits:
-        commit["id"] = commit["sha"]
-        commit["message"] = commit["commit"]["message"]
-        commit["author_username"] = (
-            commit["author"]["login"] if commit.get("author") else "unknown"
-        )
-        commit["avatar_url"] = get_avatar_url(commit)
-        commit["url"] = commit["html_url"]
-        commit["repository"] = f"{repo.owner}/{repo.name}"
-        commit["branch"] = branch_name
+    # Keep only the fields we use so the rest of the parsed response (file lists,
+    # verification details, ...) can be freed right away
+    commits = [
+        to_commit(github_commit, repo.key, branch_name)
+        for github_commit in cast("list[GitHubCommit]", response.json())
+    ]
+    if since:
+        # Each `since` value is only polled until the branch moves on, so drop the
+        # responses cached for earlier values to keep the cache from growing
+        prefix = f"{repo.commits_url_for(branch_name)}&since="
+        for cached_url in [key for key in list(ETAG_CACHE) if key.startswith(prefix)]:
+            ETAG_CACHE.pop(cached_url, None)
+    cache_response(url, response, commits)
     return commits
 
 
-def load_last_commits() -> dict[str, dict[str, str]]:
-    """Load last processed commit IDs per repository and branch.
+@cache
+def get_state_db() -> sqlite3.Connection:
+    """Open the database of last processed commits, creating it if needed.
+
+    The connection is shared by all threads; writes are serialized by
+    `LAST_COMMITS_LOCK`. Each statement is committed on its own.
+
+    Returns:
+        The database connection.
+
+    """
+    db = sqlite3.connect(
+        LAST_COMMITS_DB,
+        isolation_level=None,
+        check_same_thread=False,
+    )
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS last_commits ("
+        "repo TEXT NOT NULL, branch TEXT NOT NULL, sha TEXT NOT NULL, "
+        "date TEXT NOT NULL, PRIMARY KEY (repo, branch))",
+    )
+    return db
+
+
+def load_last_commits() -> dict[str, dict[str, BranchState]]:
+    """Load last processed commits per repository and branch.
+
+    Commits saved by older versions in `LAST_COMMITS_FILE` are imported first.
 
     Returns:
         A dictionary mapping repository/branch pairs to their last
-        processed commit IDs.
+        processed commits.
+
+    """
+    with LAST_COMMITS_LOCK:
+        import_last_commits_file()
+        rows = get_state_db().execute(
+            "SELECT repo, branch, sha, date FROM last_commits",
+        )
+        last_commits: dict[str, dict[str, BranchState]] = {}
+        for repo_key, branch_name, sha, date in rows:
+            last_commits.setdefault(repo_key, {})[branch_name] = {
+                "sha": sha,
+                "date": date,
+            }
+    return last_commits
+
+
+def import_last_commits_file() -> None:
+    """Move last processed commits from `LAST_COMMITS_FILE` into the database.
 
+    The caller must hold `LAST_COMMITS_LOCK`.
     """
     try:
         with LAST_COMMITS_FILE.open(encoding="utf-8") as f:
-            return cast("dict[str, dict[str, str]]", json.load(f))
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
+            saved = cast("dict[str, dict[str, Any]]", json.load(f))
+    except FileNotFoundError:
+        return
+    except json.JSONDecodeError:
+        logger.warning("`%s` is not valid JSON, not importing it", LAST_COMMITS_FILE)
+        return
+    for repo_key, branches in saved.items():
+        save_branch_states(
+            repo_key,
+            {
+                # Older versions stored only the commit ID per branch
+                branch_name: (
+                    {"sha": state, "date": ""} if isinstance(state, str) else state
+                )
+                for branch_name, state in branches.items()
+            },
+        )
+    imported_file = LAST_COMMITS_FILE.with_name(f"{LAST_COMMITS_FILE.name}.imported")
+    LAST_COMMITS_FILE.replace(imported_file)
+    logger.info("Imported `%s` into `%s`", LAST_COMMITS_FILE, LAST_COMMITS_DB)
+
 
+def save_branch_states(repo_key: str, branch_states: dict[str, BranchState]) -> None:
+    """Save the last processed commits of some branches of a repository.
 
-def save_last_commits(last_commits: dict[str, dict[str, str]]) -> None:
-    """Save last processed commit IDs per repository and branch.
+    Only the given branches are written. The caller must hold `LAST_COMMITS_LOCK`.
 
     Args:
-        last_commits: A dictionary mapping repository/branch pairs to their
-            last processed commit IDs.
+        repo_key: The repository key (e.g., `'owner/repo'`).
+        branch_states: A dictionary mapping branch names to their last processed
+            commits.
 
     """
-    with LAST_COMMITS_FILE.open("w", encoding="utf-8") as f:
-        json.dump(last_commits, f, indent=2)
+    get_state_db().executemany(
+        "INSERT OR REPLACE INTO last_commits (repo, branch, sha, date) "
+        "VALUES (?, ?, ?, ?)",
+        [
+            (repo_key, branch_name, state["sha"], state["date"])
+            for branch_name, state in branch_states.items()
+        ],
+    )
+
+
+def load_etag_cache() -> None:
+    """Load conditional request state saved by a previous run into `ETAG_CACHE`.
+
+    Lets the first requests after a restart be answered with `304 Not Modified`.
+    """
+    try:
+        with ETAG_CACHE_FILE.open(encoding="utf-8") as f:
+            saved = cast("dict[str, Any]", json.load(f))
+    except FileNotFoundError:
+        return
+    except json.JSONDecodeError:
+        logger.warning("`%s` is not valid JSON, ignoring it", ETAG_CACHE_FILE)
+        return
+    # Cached bodies hold our own commit records; drop them if their shape changed
+    if saved.get("version") != ETAG_CACHE_VERSION:
+        logger.info("Ignoring `%s` from an older version", ETAG_CACHE_FILE)
+        return
+    entries = cast("dict[str, list[Any]]", saved["entries"])
+    ETAG_CACHE.update({url: (etag, body) for url, (etag, body) in entries.items()})
+
+
+def save_etag_cache() -> None:
+    """Save `ETAG_CACHE` if it changed since it was last saved."""
+    if not ETAG_CACHE_CHANGED.is_set():
+        return
+    ETAG_CACHE_CHANGED.clear()
+    write_json_atomically(
+        ETAG_CACHE_FILE,
+        {"version": ETAG_CACHE_VERSION, "entries": dict(ETAG_CACHE)},
+    )
+
+
+def write_json_atomically(path: Path, data: Any) -> None:  # noqa: ANN401
+    """Write JSON to a file without ever leaving a partially written file behind.
+
+    The data is written to a temporary sibling and flushed to disk first, then
+    moved into place, so a crash leaves either the old or the new contents.
+
+    Args:
+        path: The file to write.
+        data: The data to serialize.
+
+    """
+    tmp_file = path.with_name(f"{path.name}.tmp")
+    with tmp_file.open("w", encoding="utf-8") as f:
+        # Only this script reads these files, so skip the indentation
+        json.dump(data, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    tmp_file.replace(path)
 
 
 def initialize_last_commits() -> None:
     """Initialize last commits for all repositories and their branches.
 
-    This function checks if the last commits file exists. If it doesn't,
-    it creates a new file and populates it with the latest commit IDs
-    for each branch in the specified repositories.
+    Repositories without saved commits get the latest commit ID of each of their
+    branches recorded, so only commits made from now on are announced.
     """
     last_commits = load_last_commits()
-    updated = False
 
-    for repo in REPOSITORIES:
-        repo_key = f"{repo.owner}/{repo.name}"
-        if repo_key not in last_commits:
-            last_commits[repo_key] = {}
-            branches = get_branches(repo)
-            for branch in branches:
-                branch_name = branch["name"]
-                commits = get_commits_for_branch(repo, branch_name)
-                if commits:
-                    last_commits[repo_key][branch_name] = commits[0]["id"]
-                    updated = True
+    new_repos = [repo for repo in get_repositories() if repo.key not in last_commits]
+    all_heads = get_all_branch_heads(new_repos) if GITHUB_TOKEN else {}
+    for repo in new_repos:
+        initialize_repo(repo, last_commits, all_heads.get(repo.key))
+
+    save_etag_cache()
+
 
-    if updated:
-        save_last_commits(last_commits)
+def initialize_repo(
+    repo: Repository,
+    last_commits: dict[str, dict[str, BranchState]],
+    heads: Optional[dict[str, BranchState]] = None,
+) -> bool:
+    """Record the latest commit of each branch in a repository, without notifying.
+
+    Args:
+        repo: The repository object.
+        last_commits: A dictionary mapping repository/branch pairs to their last
+            processed commits.
+        heads: The head commit of each branch, if already fetched via GraphQL.
+
+    Returns:
+        `True` if any branch's latest commit was recorded, `False` otherwise.
 
+    """
+    if heads is None and GITHUB_TOKEN:
+        heads = get_all_branch_heads([repo]).get(repo.key)
+    if heads is not None:
+        branch_states = dict(heads)
+    else:
+        # Branch listings don't include commit dates, so fetch the latest commits
+        branch_states = {}
+        for branch in get_branches(repo):
+            commits = get_commits_for_branch(repo, branch["name"])
+            if commits:
+                branch_states[branch["name"]] = {
+                    "sha": commits[0]["id"],
+                    "date": commits[0]["date"],
+                }
+    with LAST_COMMITS_LOCK:
+        last_commits[repo.key] = branch_states
+        save_branch_states(repo.key, branch_states)
+    return bool(branch_states)
+
+
+def truncate_message(message: str) -> str:
+    """Shorten a commit message to fit on one line of the embed.
+
+    Args:
+        message: The commit message.
+
+    Returns:
+        The message's first line (its title), truncated with an ellipsis if it is
+        too long.
+
+    """
+    title = message.partition("\n")[0].rstrip()
+    if len(title) <= MAX_MESSAGE_LENGTH:
+        return title
+    return f"{title[:TRUNCATE_LENGTH]}..."
 
-def send_aggregated_to_discord(  # pylint: disable=too-many-locals
+
+def send_aggregated_to_discord(
     commits: list[Commit],
     repo: str,
     branch_name: str,
     old_commit_id: str,
 ) -> None:
-    """Send a Discord message containing all new commits for a branch.
+    """Queue a Discord embed containing all new commits for a branch.
+
+    The embed is posted by the Discord worker thread, so slow or rate-limited
+    webhook calls don't hold up polling.
 
     Args:
         commits: A list of commit dictionaries.
@@ -403,20 +1261,52 @@ def send_aggregated_to_discord(  # pylint: disable=too-many-locals
         old_commit_id: The commit ID before the new commits.
 
     """
-    count = len(commits)
-    first_commit = commits[0]
     logger.debug(
         "Sending aggregated message to Discord for %s branch %s: %d new commits",
         repo,
         branch_name,
-        count,
+        len(commits),
     )
+    embed = build_embed(commits, repo, branch_name, old_commit_id)
+    try:
+        DISCORD_QUEUE.put_nowait((embed, repo, branch_name))
+    except queue.Full:
+        logger.error(  # noqa: TRY400
+            "Discord message queue is full, dropping the message for %s branch %s "
+            "(%d new commits, up to %s)",
+            repo,
+            branch_name,
+            len(commits),
+            commits[-1]["id"],
+        )
+
+
+def build_embed(
+    commits: list[Commit],
+    repo: str,
+    branch_name: str,
+    old_commit_id: str,
+) -> dict[str, Any]:
+    """Build a Discord embed listing the new commits for a branch.
+
+    Args:
+        commits: A list of commit dictionaries.
+        repo: The repository name.
+        branch_name: The name of the branch.
+        old_commit_id: The commit ID before the new commits.
+
+    Returns:
+        The embed.
+
+    """
+    count = len(commits)
+    first_commit = commits[0]
+    last_commit = commits[-1]
 
     if count == 1:
         # For a single commit, use its direct URL
         commit_url = first_commit["url"]
     else:
-        last_commit = commits[-1]
         commit_url = (
             f"https://github.com/{repo}/compare/{old_commit_id}...{last_commit['id']}"
         )
@@ -426,43 +1316,104 @@ def send_aggregated_to_discord(  # pylint: disable=too-many-locals
     )
 
     # Use the first commit's info for the embed author
-    author_url = ""
-    if first_commit.get("author") and first_commit["author"].get("html_url"):
-        author_url = first_commit["author"]["html_url"]
     embed_author = {
         "name": first_commit["author_username"],
-        "url": author_url,
-        "icon_url": first_commit["avatar_url"] or "",
+        "url": first_commit["author_url"],
+        "icon_url": get_avatar_url(first_commit) or "",
     }
 
-    # Each line: commit hash (as a clickable link), then the commit
-    # message and author username
-    lines = []
-    for commit in commits:
-        commit_link = f"[`{commit['id'][:7]}`]({commit['url']})"
-        message = (
-            commit["message"]
-            if len(commit["message"]) <= MAX_MESSAGE_LENGTH
-            else f"{commit['message'][:TRUNCATE_LENGTH]}..."
-        )
-        line = f"{commit_link} {message} - {commit['author_username']}"
-        lines.append(line)
-    description = "\n".join(lines)
+    description = build_description(commits)
 
     footer = {
         "text": "Powered by mdrxy/commit-to-discord",
     }
 
-    embed = {
+    return {
         "title": title,
         "url": commit_url,
         "description": description,
         "author": embed_author,
         "footer": footer,
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        # When the newest commit was made, rather than when it was noticed
+        "timestamp": last_commit["date"] or datetime.now(timezone.utc).isoformat(),
     }
 
-    payload = {"embeds": [embed]}
+
+def build_description(commits: list[Commit]) -> str:
+    """Build an embed description listing commits, within Discord's length limit.
+
+    Args:
+        commits: A list of commit dictionaries.
+
+    Returns:
+        One line per commit. If they don't all fit, the last line says how many
+        commits were left out instead.
+
+    """
+    description = "\n".join(format_commit_line(commit) for commit in commits)
+    if len(description) <= MAX_DESCRIPTION_LENGTH:
+        return description
+
+    lines = []
+    length = 0
+    for index, commit in enumerate(commits):
+        line = format_commit_line(commit)
+        omitted = f"... and {len(commits) - index} more"
+        # Always leave room for the line about omitted commits
+        if length + len(line) + 1 + len(omitted) > MAX_DESCRIPTION_LENGTH:
+            lines.append(omitted)
+            break
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+
+def format_commit_line(commit: Commit) -> str:
+    """Format one commit as a line of an embed's description.
+
+    Args:
+        commit: The commit data dictionary.
+
+    Returns:
+        The commit hash (as a clickable link), then the commit message and author
+        username.
+
+    """
+    return (
+        f"[`{commit['short_id']}`]({commit['url']}) "
+        f"{commit['short_message']} - {commit['author_username']}"
+    )
+
+
+def embed_length(embed: dict[str, Any]) -> int:
+    """Count the characters of an embed that Discord limits per message.
+
+    Args:
+        embed: The embed.
+
+    Returns:
+        The number of characters in the embed's title, description, author name
+        and footer text.
+
+    """
+    return (
+        len(embed["title"])
+        + len(embed["description"])
+        + len(embed["author"]["name"])
+        + len(embed["footer"]["text"])
+    )
+
+
+def post_to_discord(payload: dict[str, Any], branches: str) -> None:
+    """Post a webhook payload to Discord, waiting out any rate limit.
+
+    Args:
+        payload: The webhook payload.
+        branches: The branches the payload's embeds are about, for logging.
+
+    """
+    # Serialize once: the same body is sent and, on failure, logged
+    body = json.dumps(payload, separators=(",", ":"))
     headers = {"Content-Type": "application/json"}
     if not DISCORD_WEBHOOK_URL:
         logger.error("DISCORD_WEBHOOK_URL is not set. Cannot send message to Discord.")
@@ -470,98 +1421,645 @@ def send_aggregated_to_discord(  # pylint: disable=too-many-locals
     response = request_with_retry(
         "post",
         DISCORD_WEBHOOK_URL,
-        json=payload,
+        data=body.encode("utf-8"),
         headers=headers,
     )
+    attempt = 1
+    while (
+        response is not None
+        and response.status_code == STATUS_TOO_MANY_REQUESTS
+        and attempt < MAX_RETRIES
+    ):
+        retry_after = parse_seconds(response.headers.get("Retry-After"), 1.0)
+        logger.warning("Rate limited by Discord, retrying in %.1fs...", retry_after)
+        time.sleep(retry_after)
+        response = request_with_retry(
+            "post",
+            DISCORD_WEBHOOK_URL,
+            data=body.encode("utf-8"),
+            headers=headers,
+        )
+        attempt += 1
     if response is None:
         logger.error(
-            "Failed to post to Discord after retries for %s branch %s. Payload: %s",
-            repo,
-            branch_name,
-            json.dumps(payload, indent=2),
+            "Failed to post to Discord after retries for %s. Payload: %s",
+            branches,
+            body,
         )
         return
+
     if response.status_code == STATUS_NO_CONTENT:
         logger.info(
-            "Aggregated commit message posted to Discord for %s branch %s",
-            repo,
-            branch_name,
+            "Aggregated commit message posted to Discord for %s",
+            branches,
         )
     else:
         logger.error(
             "Failed to post to Discord (status %d): `%s`. Payload: %s",
             response.status_code,
             response.text,
-            json.dumps(payload, indent=2),
+            body,
         )
 
+    # Don't exceed the webhook's rate limit with the next message
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        time.sleep(parse_seconds(response.headers.get("X-RateLimit-Reset-After"), 0.0))
 
-def monitor_feed() -> None:  # noqa: C901, PLR0912
-    """Monitor commits across all repositories and branches."""
-    logger.info("Starting commit monitoring...")
-    last_commits = load_last_commits()
-    blacklist_patterns = parse_blacklist_patterns(BRANCH_BLACKLIST)
 
-    while not shutdown_event.is_set():  # pylint: disable=too-many-nested-blocks
-        logger.debug("Checking for new commits")
-        for repo in REPOSITORIES:
-            repo_key = f"{repo.owner}/{repo.name}"
-            if repo_key not in last_commits:
-                last_commits[repo_key] = {}
-
-            branches = get_branches(repo)
-            for branch in branches:
-                branch_name = branch["name"]
-                if is_branch_blacklisted(repo_key, branch_name, blacklist_patterns):
-                    logger.debug(
-                        "Branch %s in repo %s is blacklisted, skipping.",
-                        branch_name,
-                        repo_key,
-                    )
-                    continue
+def parse_seconds(value: Optional[str], default: float) -> float:
+    """Parse a header value holding a number of seconds.
+
+    Args:
+        value: The header value, if present.
+        default: The value to use if the header is missing or malformed.
+
+    Returns:
+        The number of seconds.
+
+    """
+    try:
+        return max(0.0, float(value)) if value else default
+    except ValueError:
+        return default
+
+
+def discord_worker() -> None:
+    """Post queued Discord embeds until a `None` sentinel is received.
+
+    Embeds queued while a message is being posted are sent together in the next
+    one, up to Discord's per-message limits.
+
+    """
+    held_over = None
+    stopping = False
+    while not stopping:
+        message = held_over or DISCORD_QUEUE.get()
+        held_over = None
+        if message is None:
+            break
+        batch = [message]
+        length = embed_length(message[0])
+        while len(batch) < MAX_EMBEDS_PER_MESSAGE:
+            try:
+                message = DISCORD_QUEUE.get_nowait()
+            except queue.Empty:
+                break
+            if message is None:
+                stopping = True
+                break
+            length += embed_length(message[0])
+            if length > MAX_EMBED_CHARACTERS_PER_MESSAGE:
+                held_over = message
+                break
+            batch.append(message)
+        try:
+            post_to_discord(
+                {"embeds": [embed for embed, _, _ in batch]},
+                ", ".join(f"{repo} branch {branch}" for _, repo, branch in batch),
+            )
+        except Exception:
+            logger.exception("Unexpected error while posting to Discord")
+
+
+def start_discord_worker() -> threading.Thread:
+    """Start the background thread that posts queued Discord messages.
+
+    Returns:
+        The worker thread.
 
-                commits = get_commits_for_branch(repo, branch_name)
-                if not commits:
-                    logger.warning(
-                        "No commits returned for %s branch %s.",
-                        repo_key,
-                        branch_name,
-                    )
+    """
+    worker = threading.Thread(target=discord_worker, name="discord", daemon=True)
+    worker.start()
+    return worker
+
+
+def stop_discord_worker(worker: threading.Thread) -> None:
+    """Post any messages still queued, then stop the worker thread.
+
+    Args:
+        worker: The worker thread, as returned by `start_discord_worker`.
+
+    """
+    DISCORD_QUEUE.put(None)
+    worker.join()
+
+
+def process_repo(
+    repo: Repository,
+    last_commits: dict[str, dict[str, BranchState]],
+    blacklist_patterns: dict[str, re.Pattern[str]],
+    heads: Optional[dict[str, BranchState]] = None,
+) -> bool:
+    """Check one repository for new commits and notify Discord about them.
+
+    Runs on a worker thread; every access to `last_commits` is made while holding
+    `LAST_COMMITS_LOCK`.
+
+    Args:
+        repo: The repository object.
+        last_commits: A dictionary mapping repository/branch pairs to their last
+            processed commits.
+        blacklist_patterns: The blacklist patterns.
+        heads: The head commit of each branch, if already fetched via GraphQL.
+
+    Returns:
+        `True` if the last processed commit of any branch changed, `False` otherwise.
+
+    """
+    if shutdown_event.is_set():
+        return False
+    repo_key = repo.key
+    updated = False
+    with LAST_COMMITS_LOCK:
+        repo_commits = last_commits.get(repo_key)
+        known_states = dict(repo_commits or {})
+    if repo_commits is None:
+        # Added since startup: start from the current commits, as on startup
+        return initialize_repo(repo, last_commits, heads)
+
+    branch_names = []
+    for branch_name in find_updated_branches(repo, known_states, heads):
+        if is_branch_blacklisted(repo_key, branch_name, blacklist_patterns):
+            logger.debug(
+                "Branch %s in repo %s is blacklisted, skipping.",
+                branch_name,
+                repo_key,
+            )
+            continue
+        branch_names.append(branch_name)
+
+    # Each branch is its own round trip, so fetch them concurrently
+    branch_commits = BRANCH_EXECUTOR.map(
+        lambda name: fetch_branch_commits(repo, name, known_states.get(name)),
+        branch_names,
+    )
+
+    for branch_name, commits in zip(branch_names, branch_commits):
+        if shutdown_event.is_set():
+            # The remaining branches stay unprocessed, so the next run picks them up
+            break
+        state = known_states.get(branch_name)
+        if not commits:
+            logger.warning(
+                "No commits returned for %s branch %s.",
+                repo_key,
+                branch_name,
+            )
+            continue
+
+        # If this branch is new, consider all commits as new
+        new_commits = find_new_commits(commits, state["sha"] if state else None)
+        if new_commits:
+            with LAST_COMMITS_LOCK:
+                # A webhook delivery may have announced these commits meanwhile
+                if repo_commits.get(branch_name) != state:
                     continue
+                send_aggregated_to_discord(
+                    new_commits,
+                    repo_key,
+                    branch_name,
+                    state["sha"] if state else "",
+                )
+                # Update the branch tracking with the newest commit
+                repo_commits[branch_name] = {
+                    "sha": new_commits[-1]["id"],
+                    "date": new_commits[-1]["date"],
+                }
+                save_branch_states(repo_key, {branch_name: repo_commits[branch_name]})
+            updated = True
+
+    return updated
 
-                # If this branch is new, consider all commits as new
-                if branch_name not in last_commits[repo_key]:
-                    new_commits = commits[::-1]
-                else:
-                    last_commit_id = last_commits[repo_key][branch_name]
-                    index = None
-                    for i, commit in enumerate(commits):
-                        if commit["id"] == last_commit_id:
-                            index = i
-                            break
-                    if index is None:
-                        new_commits = commits[::-1]
-                    else:
-                        new_commits = commits[:index][::-1]
-
-                if new_commits:
-                    send_aggregated_to_discord(
-                        new_commits,
-                        repo_key,
-                        branch_name,
-                        last_commits.get(repo_key, {}).get(branch_name, ""),
-                    )
-                    # Update the branch tracking with the newest commit
-                    last_commits[repo_key][branch_name] = new_commits[-1]["id"]
-                    save_last_commits(last_commits)
-
-        time.sleep(POLL_INTERVAL_SECONDS)
-
-    # Clean shutdown: save state and exit
-    save_last_commits(last_commits)
+
+def find_updated_branches(
+    repo: Repository,
+    known_states: dict[str, BranchState],
+    heads: Optional[dict[str, BranchState]] = None,
+) -> list[str]:
+    """Find the branches of a repository that may have new commits.
+
+    Args:
+        repo: The repository object.
+        known_states: The last processed commit of each known branch.
+        heads: The head commit of each branch, if already fetched via GraphQL.
+
+    Returns:
+        The names of the branches that are new or whose head commit moved.
+
+    """
+    head_ids = None
+    if heads is not None:
+        head_ids = {branch_name: head["sha"] for branch_name, head in heads.items()}
+    elif USE_EVENTS_FEED:
+        head_ids = get_push_events(repo)
+    if head_ids is None:
+        # The listing includes each branch's head commit
+        head_ids = {
+            branch["name"]: branch["commit"]["sha"] for branch in get_branches(repo)
+        }
+    # Only branches whose head moved need their commits fetched
+    return [
+        branch_name
+        for branch_name, head in head_ids.items()
+        if branch_name not in known_states or known_states[branch_name]["sha"] != head
+    ]
+
+
+def fetch_branch_commits(
+    repo: Repository,
+    branch_name: str,
+    state: Optional[BranchState],
+) -> list[Commit]:
+    """Fetch a branch's commits, limited to those since the last processed one.
+
+    The `since` filter is inclusive of a second before the last processed commit,
+    so that commit is expected back as the oldest one. If it isn't (history was
+    rewritten, or commits were pushed out of date order), the unfiltered list is
+    fetched instead.
+
+    Args:
+        repo: The repository object.
+        branch_name: The name of the branch.
+        state: The branch's last processed commit, if any.
+
+    Returns:
+        A list of commits in the branch (newest first), or empty list on failure or
+        once a shutdown is requested.
+
+    """
+    if shutdown_event.is_set():
+        return []
+    if not state or not state["date"]:
+        return get_commits_for_branch(repo, branch_name)
+    commits = get_commits_for_branch(
+        repo,
+        branch_name,
+        since=since_timestamp(state["date"]),
+    )
+    if any(commit["id"] == state["sha"] for commit in commits):
+        return commits
+    return get_commits_for_branch(repo, branch_name)
+
+
+def since_timestamp(date: str) -> str:
+    """Build a `since` query value covering the given commit date.
+
+    Args:
+        date: The ISO 8601 commit date, as returned by GitHub.
+
+    Returns:
+        The ISO 8601 UTC timestamp one second earlier.
+
+    """
+    parsed = datetime.fromisoformat(date.replace("Z", "+00:00"))
+    earlier = parsed.astimezone(timezone.utc) - timedelta(seconds=1)
+    return earlier.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def find_new_commits(
+    commits: list[Commit],
+    last_commit_id: Optional[str],
+) -> list[Commit]:
+    """Find the commits newer than the last processed one.
+
+    Args:
+        commits: The branch's commits, newest first.
+        last_commit_id: The last processed commit ID, or `None` for a new branch.
+
+    Returns:
+        The new commits, oldest first. All commits are considered new if the last
+        processed commit is unknown or not among them.
+
+    """
+    if last_commit_id is None:
+        return commits[::-1]
+    if not commits or commits[0]["id"] == last_commit_id:
+        # The usual case when polling: nothing new. Pushes that only move a branch
+        # back to an existing commit list no commits at all
+        return []
+    # Stop at the first match rather than collecting every ID first
+    index = next(
+        (i for i, commit in enumerate(commits) if commit["id"] == last_commit_id),
+        None,
+    )
+    if index is None:
+        return commits[::-1]
+    # Slice and reverse in one step; `index` is at least 1 here
+    return commits[index - 1 :: -1]
+
+
+def handle_push_event(
+    payload: dict[str, Any],
+    last_commits: dict[str, dict[str, BranchState]],
+    blacklist_patterns: dict[str, re.Pattern[str]],
+) -> bool:
+    """Notify Discord about the commits of a `push` webhook delivery.
+
+    A delivery is only acted on if it continues from the last processed commit of
+    the branch (or the branch is not known yet). GitHub doesn't guarantee delivery
+    order and deliveries can be redelivered, so any other delivery is left for
+    polling to reconcile, never moving the branch back to an older commit.
+
+    Args:
+        payload: The webhook payload.
+        last_commits: A dictionary mapping repository/branch pairs to their last
+            processed commits.
+        blacklist_patterns: The blacklist patterns.
+
+    Returns:
+        `True` if the last processed commit of the branch changed, `False` otherwise.
+
+    """
+    target = find_push_target(payload, blacklist_patterns)
+    if target is None:
+        return False
+    repo_key, branch_name = target
+
+    # The payload lists commits oldest first
+    commits = [
+        webhook_to_commit(push_commit, repo_key, branch_name)
+        for push_commit in reversed(payload.get("commits") or [])
+    ]
+    with LAST_COMMITS_LOCK:
+        repo_commits = last_commits.get(repo_key)
+        if repo_commits is None:
+            # Not initialized yet; the next poll records its current commits
+            return False
+        state = repo_commits.get(branch_name)
+        if state and payload.get("before") != state["sha"]:
+            logger.debug(
+                "Push to %s branch %s doesn't continue from %s, leaving it to polling",
+                repo_key,
+                branch_name,
+                state["sha"],
+            )
+            return False
+        new_commits = find_new_commits(commits, state["sha"] if state else None)
+        if not new_commits:
+            return False
+        send_aggregated_to_discord(
+            new_commits,
+            repo_key,
+            branch_name,
+            state["sha"] if state else "",
+        )
+        repo_commits[branch_name] = {
+            "sha": new_commits[-1]["id"],
+            "date": new_commits[-1]["date"],
+        }
+        save_branch_states(repo_key, {branch_name: repo_commits[branch_name]})
+    return True
+
+
+def find_push_target(
+    payload: dict[str, Any],
+    blacklist_patterns: dict[str, re.Pattern[str]],
+) -> Optional[tuple[str, str]]:
+    """Find the monitored branch a `push` webhook delivery is about.
+
+    Args:
+        payload: The webhook payload.
+        blacklist_patterns: The blacklist patterns.
+
+    Returns:
+        The repository key and branch name, or `None` if the push is to be ignored
+        (not to a branch, a branch deletion, an unmonitored repository or a
+        blacklisted branch).
+
+    """
+    ref = payload.get("ref") or ""
+    if not ref.startswith("refs/heads/") or payload.get("deleted"):
+        return None
+    branch_name = ref.removeprefix("refs/heads/")
+    full_name = ((payload.get("repository") or {}).get("full_name") or "").lower()
+    repo_key = next(
+        (repo.key for repo in get_repositories() if repo.key.lower() == full_name),
+        None,
+    )
+    if repo_key is None:
+        logger.debug("Ignoring push to unmonitored repository %s", full_name)
+        return None
+    if is_branch_blacklisted(repo_key, branch_name, blacklist_patterns):
+        logger.debug(
+            "Branch %s in repo %s is blacklisted, skipping.",
+            branch_name,
+            repo_key,
+        )
+        return None
+    return repo_key, branch_name
+
+
+class WebhookServer(ThreadingHTTPServer):
+    """HTTP server receiving GitHub webhook deliveries.
+
+    Attributes:
+        last_commits: A dictionary mapping repository/branch pairs to their last
+            processed commits.
+        blacklist_patterns: The blacklist patterns.
+
+    """
+
+    # Handler threads are joined by `server_close()`, so no delivery is still being
+    # handled once the server is closed
+    daemon_threads = False
+    block_on_close = True
+
+    def __init__(
+        self,
+        last_commits: dict[str, dict[str, BranchState]],
+        blacklist_patterns: dict[str, re.Pattern[str]],
+    ) -> None:
+        """Bind the server to `WEBHOOK_PORT` on all interfaces.
+
+        Args:
+            last_commits: A dictionary mapping repository/branch pairs to their last
+                processed commits.
+            blacklist_patterns: The blacklist patterns.
+
+        """
+        super().__init__(("", WEBHOOK_PORT), WebhookHandler)
+        self.last_commits = last_commits
+        self.blacklist_patterns = blacklist_patterns
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """Handles GitHub webhook deliveries, verifying their signatures."""
+
+    # Drop connections that stall, so they can't hold up shutdown
+    timeout = 5
+
+    def do_POST(self) -> None:
+        """Verify a webhook delivery and announce the commits it pushed."""
+        length_header = self.headers.get("Content-Length")
+        if length_header is None:
+            self.send_error(411)
+            return
+        try:
+            length = int(length_header)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # A negative length would make `read()` consume until the client stops
+            self.send_error(400)
+            return
+        if length > MAX_WEBHOOK_PAYLOAD_BYTES:
+            self.send_error(413)
+            return
+        body = self.rfile.read(length)
+        if not is_valid_signature(body, self.headers.get("X-Hub-Signature-256")):
+            logger.warning("Rejected webhook delivery with an invalid signature")
+            self.send_error(401)
+            return
+        self.send_response(STATUS_NO_CONTENT)
+        self.end_headers()
+        self.handle_delivery(body)
+
+    def handle_delivery(self, body: bytes) -> None:
+        """Announce the commits of a verified delivery, if it is a push.
+
+        Args:
+            body: The raw request body.
+
+        """
+        if self.headers.get("X-GitHub-Event") != "push":
+            return
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            logger.warning("Received a push webhook delivery that is not valid JSON")
+            return
+        if not isinstance(payload, dict):
+            logger.warning("Received a push webhook delivery that is not an object")
+            return
+        server = cast("WebhookServer", self.server)
+        try:
+            handle_push_event(payload, server.last_commits, server.blacklist_patterns)
+        except Exception:
+            # Log unexpected payloads here rather than as a bare traceback on stderr
+            logger.exception("Failed to handle a push webhook delivery")
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002, ANN401
+        """Log requests at debug level instead of writing them to stderr.
+
+        Args:
+            format: The message format string.
+            *args: The values to format into the message.
+
+        """
+        logger.debug(
+            "Webhook request from %s: %s", self.client_address[0], format % args
+        )
+
+
+def is_valid_signature(body: bytes, signature: Optional[str]) -> bool:
+    """Check a webhook delivery's `X-Hub-Signature-256` against `WEBHOOK_SECRET`.
+
+    Args:
+        body: The raw request body.
+        signature: The `X-Hub-Signature-256` header value, if present.
+
+    Returns:
+        `True` if the signature matches, `False` otherwise.
+
+    """
+    if not signature:
+        return False
+    digest = hmac.new(WEBHOOK_SECRET.encode("utf-8"), body, hashlib.sha256)
+    return hmac.compare_digest(f"sha256={digest.hexdigest()}", signature)
+
+
+def start_webhook_server(
+    last_commits: dict[str, dict[str, BranchState]],
+    blacklist_patterns: dict[str, re.Pattern[str]],
+) -> Optional[WebhookServer]:
+    """Start receiving GitHub webhooks in the background, if configured.
+
+    Args:
+        last_commits: A dictionary mapping repository/branch pairs to their last
+            processed commits.
+        blacklist_patterns: The blacklist patterns.
+
+    Returns:
+        The running server, or `None` if `WEBHOOK_SECRET` is not set.
+
+    """
+    if not WEBHOOK_SECRET:
+        return None
+    server = WebhookServer(last_commits, blacklist_patterns)
+    threading.Thread(target=server.serve_forever, name="webhooks", daemon=True).start()
+    logger.info("Receiving GitHub webhooks on port %d", WEBHOOK_PORT)
+    return server
+
+
+def monitor_feed() -> None:
+    """Monitor commits across all repositories and branches.
+
+    Repositories are checked concurrently, one worker thread per repository.
+    """
+    logger.info("Starting commit monitoring...")
+    last_commits = load_last_commits()
+    blacklist_patterns = parse_blacklist_patterns(BRANCH_BLACKLIST)
+    discord_worker_thread = start_discord_worker()
+    webhook_server = start_webhook_server(last_commits, blacklist_patterns)
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        while not shutdown_event.is_set():
+            logger.debug("Checking for new commits")
+            cycle_start = time.monotonic()
+            requests_before = requests_made()
+            repos = get_repositories()
+            # With a token, one GraphQL request tells which branches moved everywhere
+            all_heads = (
+                get_all_branch_heads(repos)
+                if GITHUB_TOKEN and not USE_EVENTS_FEED
+                else {}
+            )
+            futures = [
+                executor.submit(
+                    process_repo,
+                    repo,
+                    last_commits,
+                    blacklist_patterns,
+                    all_heads.get(repo.key),
+                )
+                for repo in repos
+            ]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception:  # noqa: PERF203
+                    logger.exception("Unexpected error while checking for commits")
+            save_etag_cache()
+
+            # Sleep out the rest of the interval so cycles start at a steady cadence,
+            # honoring GitHub's `X-Poll-Interval` if it asks for a slower one, and
+            # slowing down if polling at this rate would run out of requests before
+            # the rate limit resets. The wait ends early on shutdown.
+            paced_interval = rate_limited_interval(requests_before)
+            if paced_interval > POLL_INTERVAL_SECONDS:
+                logger.debug(
+                    "Slowing polling to every %.0fs to stay within the rate limit",
+                    paced_interval,
+                )
+            interval = max(
+                POLL_INTERVAL_SECONDS, API_STATE.poll_interval, paced_interval
+            )
+            elapsed = time.monotonic() - cycle_start
+            shutdown_event.wait(max(0.0, interval - elapsed))
+
+    # Clean shutdown: stop taking deliveries and wait for those being handled, then
+    # flush pending notifications, save state and exit
+    if webhook_server is not None:
+        webhook_server.shutdown()
+        webhook_server.server_close()
+    stop_discord_worker(discord_worker_thread)
+    with LAST_COMMITS_LOCK:
+        get_state_db().close()
+    save_etag_cache()
     logger.info("Commit watcher exited cleanly")
 
 
 if __name__ == "__main__":
+    load_etag_cache()
     initialize_last_commits()
     monitor_feed()
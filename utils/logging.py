@@ -1,20 +1,23 @@
 """Logging module."""
 
+from __future__ import annotations
+
 import logging
 import os
-from datetime import datetime
+from datetime import datetime, timezone, tzinfo
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-import pytz
 from colorlog import ColoredFormatter
 
 log_level = os.getenv("LOG_LEVEL", "info").upper()
 log_tz_name = os.getenv("LOG_TZ", "UTC")
 try:
-    log_tz = pytz.timezone(log_tz_name)
-except pytz.UnknownTimeZoneError:
+    log_tz: tzinfo = ZoneInfo(log_tz_name)
+except (ZoneInfoNotFoundError, ValueError):
     logger = logging.getLogger("commit_to_discord")
     logger.warning("Unknown timezone `%s`, defaulting to `UTC`.", log_tz_name)
-    log_tz = pytz.utc
+    log_tz = timezone.utc
 
 LOG_COLORS = {
     "DEBUG": "white",
@@ -28,8 +31,10 @@ LOG_COLORS = {
 def configure_logging(logger_name: str = "commit_to_discord") -> logging.Logger:
     """Set up logging with colorized output and a configurable timezone."""
     logger = logging.getLogger(logger_name)
-    if logger.hasHandlers():
-        # Avoid re-adding handlers if the logger is already configured
+    if logger.handlers:
+        # Avoid re-adding handlers if the logger is already configured. Only its own
+        # handlers count: `hasHandlers()` would also see the root logger's, leaving
+        # this one unconfigured if something set those up first
         return logger
 
     logger.setLevel(getattr(logging, log_level, logging.INFO))
@@ -45,12 +50,14 @@ def configure_logging(logger_name: str = "commit_to_discord") -> logging.Logger:
         Uses colorized output.
         """
 
-        def format_time(self, record: logging.LogRecord) -> str:
+        def formatTime(  # noqa: N802
+            self,
+            record: logging.LogRecord,
+            datefmt: Optional[str] = None,  # noqa: ARG002
+        ) -> str:
             """Convert record time to the configured timezone."""
-            utc_dt = datetime.fromtimestamp(record.created, tz=pytz.utc)
-            local_dt = utc_dt.astimezone(log_tz)
             # Use ISO 8601 format
-            return local_dt.isoformat()
+            return datetime.fromtimestamp(record.created, tz=log_tz).isoformat()
 
     # Define the formatter with color and PID
     formatter = TimezoneFormatter(
@@ -60,6 +67,9 @@ def configure_logging(logger_name: str = "commit_to_discord") -> logging.Logger:
     )
     console_handler.setFormatter(formatter)
     logger.addHandler(console_handler)
+    # Records are fully handled here; don't print them again if the root logger
+    # gets a handler too
+    logger.propagate = False
 
     # Also configure the Werkzeug logger
     werkzeug_logger = logging.getLogger("werkzeug")
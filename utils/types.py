@@ -2,19 +2,21 @@
 
 from __future__ import annotations
 
-from typing import TypedDict
+from typing import Any, TypedDict
 
 
 class CommitAuthor(TypedDict):
     """Represents the author of a commit."""
 
     email: str
+    date: str
 
 
 class CommitDetails(TypedDict):
     """Represents the details of a commit."""
 
     author: CommitAuthor
+    committer: CommitAuthor
     message: str
 
 
@@ -26,23 +28,53 @@ class AuthorDetails(TypedDict):
     html_url: str
 
 
-class Commit(TypedDict):
-    """Represents a commit."""
+class GitHubCommit(TypedDict):
+    """Represents a commit as returned by the GitHub API."""
 
     sha: str
     commit: CommitDetails
-    author: AuthorDetails
+    author: AuthorDetails | None
     html_url: str
+
+
+class Commit(TypedDict):
+    """Represents a commit, reduced to the fields used for notifications."""
+
+    id: str
+    short_id: str
+    short_message: str
     author_username: str
-    avatar_url: str | None
+    author_url: str
+    avatar_url: str
+    author_email: str
+    url: str
+    date: str
     repository: str
     branch: str
-    id: str
-    message: str
-    url: str
+
+
+class BranchCommit(TypedDict):
+    """Represents the head commit of a branch."""
+
+    sha: str
 
 
 class Branch(TypedDict):
     """Represents a branch."""
 
     name: str
+    commit: BranchCommit
+
+
+class Event(TypedDict):
+    """Represents a repository event."""
+
+    type: str
+    payload: dict[str, Any]
+
+
+class BranchState(TypedDict):
+    """Represents the last processed commit of a branch."""
+
+    sha: str
+    date: str